@@ -58,6 +58,12 @@ async def async_main():
         action="store_true",
         help="Continue from the last incomplete workflow session.",
     )
+    run_parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="Do not echo subprocess output to the terminal (headless runs).",
+    )
 
     # Workon command
     workon_parser = subparsers.add_parser(
@@ -92,6 +98,9 @@ async def async_main():
         return
 
     # Default 'run' logic follows
+    if args.quiet:
+        copium_loop.shell.get_output_sink().quiet = True
+
     if args.monitor:
         app = copium_loop.ui.TextualDashboard()
         await app.run_async()
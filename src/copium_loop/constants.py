@@ -1,3 +1,5 @@
+import os
+
 # Default models to try in order. Gemini-3 and 2.5
 # share the same quota, so no point in add those as
 # fallbacks.
@@ -33,8 +35,43 @@ NODE_TIMEOUT = 3600
 # Command execution total timeout in seconds (30 minutes)
 COMMAND_TIMEOUT = 1800
 
+# Seconds a timed-out process group gets between SIGTERM and SIGKILL
+PROCESS_GROUP_GRACE_PERIOD = 5
+
+# Terminal echo of subprocess output is coalesced and flushed at most every
+# OUTPUT_FLUSH_INTERVAL seconds, or as soon as OUTPUT_FLUSH_SIZE chars are pending
+OUTPUT_FLUSH_INTERVAL = 0.05
+OUTPUT_FLUSH_SIZE = 64 * 1024
+
+# Subprocess pipe reads start at STREAM_READ_MIN_SIZE bytes and double while
+# the pipe keeps filling them, up to STREAM_READ_MAX_SIZE
+STREAM_READ_MIN_SIZE = 1024
+STREAM_READ_MAX_SIZE = 64 * 1024
+
+# Default resource profiles for subprocesses, by name. Any field can be
+# overridden with COPIUM_<NAME>_MEMORY_MB, _CPU_SECONDS, _NICE or _IONICE
+# (an ionice class: 1 realtime, 2 best-effort, 3 idle; optionally "class:level").
+RESOURCE_PROFILES = {
+    # Keep runaway test suites from starving the dashboard and other sessions
+    "tester": {"nice": 10, "ionice_class": 2, "ionice_level": 7},
+    "gemini": {},
+}
+
+# Seconds between the soft RLIMIT_CPU (SIGXCPU) and the hard one (SIGKILL)
+CPU_LIMIT_GRACE = 5
+
+# Host-wide cap on concurrently running heavy commands (tests, builds,
+# installs) across all copium-loop sessions; override with COPIUM_HEAVY_SLOTS
+HEAVY_COMMAND_SLOTS = max(1, (os.cpu_count() or 1) // 4)
+
+# Seconds between attempts to take a heavy-command slot while queued
+HEAVY_COMMAND_POLL_INTERVAL = 0.5
+
 # Max output size in bytes (1MB) to prevent memory exhaustion
 MAX_OUTPUT_SIZE = 1024 * 1024
 
+# Number of full command outputs kept on disk per session when spilling
+MAX_SPILLED_OUTPUTS = 20
+
 # Default minimum test coverage percentage
 DEFAULT_MIN_COVERAGE = 80
@@ -3,6 +3,7 @@ from typing import Any
 
 from copium_loop.constants import COMMAND_TIMEOUT, INACTIVITY_TIMEOUT, MODELS
 from copium_loop.engine.base import LLMEngine
+from copium_loop.limits import get_resource_profile
 from copium_loop.shell import stream_subprocess
 from copium_loop.telemetry import get_telemetry
 
@@ -52,14 +53,8 @@ class GeminiEngine(LLMEngine):
             }
         )
 
-        (
-            stdout,
-            stderr,
-            interleaved,
-            exit_code,
-            timed_out,
-            timeout_message,
-        ) = await stream_subprocess(
+        resource_profile = get_resource_profile("gemini")
+        result = await stream_subprocess(
             "gemini",
             cmd_args,
             env,
@@ -68,19 +63,31 @@ class GeminiEngine(LLMEngine):
             inactivity_timeout=inactivity_timeout,
             capture_stderr=True,
             source="llm",
+            resource_profile=resource_profile,
         )
+        # Index rather than unpack so stderr is only materialized on failure
+        exit_code, timed_out, timeout_message = result[3:]
 
         if timed_out:
             raise Exception(f"[TIMEOUT] Gemini CLI timed out: {timeout_message}")
 
+        # Test doubles of stream_subprocess may return a plain tuple
+        limit_exceeded = getattr(result, "limit_exceeded", None)
+        if limit_exceeded:
+            raise Exception(
+                "[LIMIT] Process exceeded its "
+                f"{resource_profile.describe(limit_exceeded)}: Gemini CLI "
+                f"exited with code {exit_code}\nSTDERR:\n{result[1]}"
+            )
+
         if exit_code != 0:
             raise Exception(
                 f"Gemini CLI exited with code {exit_code}\n"
-                f"STDOUT:\n{stdout}\n"
-                f"STDERR:\n{stderr}"
+                f"STDOUT:\n{result[0]}\n"
+                f"STDERR:\n{result[1]}"
             )
 
-        return stdout.strip()
+        return result[0].strip()
 
     async def invoke(
         self,
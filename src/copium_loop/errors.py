@@ -23,3 +23,13 @@ def is_infrastructure_error(error_msg: str | None) -> bool:
 
     error_msg_lower = error_msg.lower()
     return any(pattern.lower() in error_msg_lower for pattern in infra_patterns)
+
+
+def is_resource_limit_error(error_msg: str | None) -> bool:
+    """
+    Identifies failures caused by a subprocess hitting its resource profile
+    limits, as reported by `run_command`.
+    """
+    if not error_msg:
+        return False
+    return "[LIMIT] Process exceeded its" in error_msg
@@ -0,0 +1,88 @@
+import asyncio
+import contextlib
+import fcntl
+import os
+import time
+from pathlib import Path
+
+from copium_loop.constants import HEAVY_COMMAND_POLL_INTERVAL, HEAVY_COMMAND_SLOTS
+
+
+def get_lock_dir() -> Path:
+    """Returns the host-wide directory for copium-loop lock files."""
+    return Path.home() / ".copium" / "locks"
+
+
+class HostSemaphore:
+    """
+    Counting semaphore shared by every copium-loop process on the host.
+
+    Each of the `slots` permits is a lock file under ~/.copium/locks held with
+    `flock`. The kernel drops the lock when its holder exits, so a crashed
+    session never leaks a permit. Waiters poll every `poll_interval` seconds,
+    so slots are handed out roughly, not strictly, in arrival order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slots: int,
+        lock_dir: Path | None = None,
+        poll_interval: float = HEAVY_COMMAND_POLL_INTERVAL,
+    ):
+        self.name = name
+        self.slots = max(1, slots)
+        self.lock_dir = lock_dir or get_lock_dir()
+        self.poll_interval = poll_interval
+
+    def _slot_path(self, index: int) -> Path:
+        return self.lock_dir / f"{self.name}.{index}.lock"
+
+    def _try_acquire(self) -> int | None:
+        """Returns the fd of a slot lock that is now held, or None if all are busy."""
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        for index in range(self.slots):
+            fd = os.open(self._slot_path(index), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+            return fd
+        return None
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, on_wait=None):
+        """
+        Holds one slot for the duration of the block and yields the seconds
+        spent queueing for it. `on_wait` is called once if all slots are busy.
+        """
+        start = time.monotonic()
+        fd = self._try_acquire()
+        if fd is None and on_wait:
+            on_wait()
+        while fd is None:
+            await asyncio.sleep(self.poll_interval)
+            fd = self._try_acquire()
+
+        try:
+            yield time.monotonic() - start
+        finally:
+            with contextlib.suppress(OSError):
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+_heavy_command_semaphore: HostSemaphore | None = None
+
+
+def get_heavy_command_semaphore() -> HostSemaphore:
+    """Returns the semaphore that caps heavy commands (tests, builds, installs)."""
+    global _heavy_command_semaphore
+    if _heavy_command_semaphore is None:
+        try:
+            slots = int(os.environ.get("COPIUM_HEAVY_SLOTS", HEAVY_COMMAND_SLOTS))
+        except ValueError:
+            slots = HEAVY_COMMAND_SLOTS
+        _heavy_command_semaphore = HostSemaphore("heavy", slots)
+    return _heavy_command_semaphore
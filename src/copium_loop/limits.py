@@ -0,0 +1,187 @@
+import contextlib
+import ctypes
+import os
+import platform
+import re
+import resource
+import signal
+from dataclasses import dataclass
+
+from copium_loop.constants import CPU_LIMIT_GRACE, RESOURCE_PROFILES
+
+# ioprio_set(2) has no libc wrapper or os binding
+_IOPRIO_SET_SYSCALLS = {"x86_64": 251, "aarch64": 30, "i386": 289, "i686": 289}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_SHIFT = 13
+
+# Allocation failures as reported by common runtimes once RLIMIT_AS is hit
+OUT_OF_MEMORY_PATTERNS = [
+    r"\bMemoryError\b",
+    r"Cannot allocate memory",
+    r"std::bad_alloc",
+    r"memory allocation of \d+ bytes failed",
+    r"JavaScript heap out of memory",
+    r"\bout of memory\b",
+]
+
+
+@dataclass(frozen=True)
+class ResourceProfile:
+    """
+    Limits applied to a subprocess between fork and exec.
+
+    `memory_bytes` caps the address space (RLIMIT_AS) and `cpu_seconds` the
+    CPU time (RLIMIT_CPU, SIGXCPU first, SIGKILL CPU_LIMIT_GRACE seconds
+    later). `nice` is added to the child's niceness and `ionice_class` /
+    `ionice_level` set its I/O scheduling priority on Linux. Both limits are
+    inherited by everything the child spawns.
+    """
+
+    memory_bytes: int | None = None
+    cpu_seconds: int | None = None
+    nice: int | None = None
+    ionice_class: int | None = None
+    ionice_level: int = 4
+
+    def __bool__(self) -> bool:
+        return any(
+            value is not None
+            for value in (
+                self.memory_bytes,
+                self.cpu_seconds,
+                self.nice,
+                self.ionice_class,
+            )
+        )
+
+    def preexec_fn(self):
+        """
+        Returns a callable for `preexec_fn`. Everything that could allocate or
+        take locks is resolved here, in the parent, so the child only makes
+        system calls.
+        """
+        rlimits = []
+        if self.memory_bytes is not None:
+            rlimits.append(
+                _clamped(resource.RLIMIT_AS, self.memory_bytes, self.memory_bytes)
+            )
+        if self.cpu_seconds is not None:
+            rlimits.append(
+                _clamped(
+                    resource.RLIMIT_CPU,
+                    self.cpu_seconds,
+                    self.cpu_seconds + CPU_LIMIT_GRACE,
+                )
+            )
+        set_io_priority = None
+        if self.ionice_class is not None:
+            set_io_priority = _io_priority_setter(self.ionice_class, self.ionice_level)
+        nice = self.nice
+
+        def apply():
+            for limit, values in rlimits:
+                resource.setrlimit(limit, values)
+            # Scheduling hints are best-effort; never fail the command over them
+            if nice:
+                with contextlib.suppress(OSError):
+                    os.nice(nice)
+            if set_io_priority:
+                set_io_priority()
+
+        return apply
+
+    def classify_failure(
+        self, returncode: int | None, cpu_time: float, output: str
+    ) -> str | None:
+        """
+        Returns "cpu" or "memory" if a failed command most likely died because
+        it hit one of this profile's limits, else None.
+        """
+        if not returncode:
+            return None
+        if self.cpu_seconds is not None and (
+            returncode == -signal.SIGXCPU
+            or (returncode == -signal.SIGKILL and cpu_time >= self.cpu_seconds)
+        ):
+            return "cpu"
+        if self.memory_bytes is not None and any(
+            re.search(pattern, output) for pattern in OUT_OF_MEMORY_PATTERNS
+        ):
+            return "memory"
+        return None
+
+    def describe(self, limit: str) -> str:
+        """Human-readable description of one of the profile's limits."""
+        if limit == "cpu":
+            return f"CPU time limit of {self.cpu_seconds}s"
+        if limit == "memory":
+            return f"memory limit of {self.memory_bytes // (1024 * 1024)} MB"
+        return f"{limit} limit"
+
+
+def _clamped(limit: int, soft: int, hard: int) -> tuple[int, tuple[int, int]]:
+    """Fits the requested limits under the current hard limit, which can't rise."""
+    _, current_hard = resource.getrlimit(limit)
+    if current_hard != resource.RLIM_INFINITY:
+        soft = min(soft, current_hard)
+        hard = min(hard, current_hard)
+    return limit, (soft, hard)
+
+
+def _io_priority_setter(io_class: int, level: int):
+    """Returns a callable that sets the calling process's I/O priority, or None."""
+    syscall_nr = _IOPRIO_SET_SYSCALLS.get(platform.machine())
+    if syscall_nr is None:
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    syscall = libc.syscall
+    ioprio = (io_class << _IOPRIO_CLASS_SHIFT) | level
+
+    def set_io_priority():
+        # Fails with EPERM for the realtime class without CAP_SYS_ADMIN; ignored
+        syscall(syscall_nr, _IOPRIO_WHO_PROCESS, 0, ioprio)
+
+    return set_io_priority
+
+
+def get_resource_profile(name: str) -> ResourceProfile:
+    """
+    Returns the default profile `name` from RESOURCE_PROFILES, with any
+    COPIUM_<NAME>_* environment overrides applied.
+    """
+    fields = dict(RESOURCE_PROFILES.get(name, {}))
+    prefix = f"COPIUM_{name.upper()}_"
+
+    def env_int(key: str) -> int | None:
+        value = os.environ.get(prefix + key)
+        if value is None or not value.strip():
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return None
+
+    memory_mb = env_int("MEMORY_MB")
+    if memory_mb is not None:
+        fields["memory_bytes"] = memory_mb * 1024 * 1024 if memory_mb > 0 else None
+    cpu_seconds = env_int("CPU_SECONDS")
+    if cpu_seconds is not None:
+        fields["cpu_seconds"] = cpu_seconds if cpu_seconds > 0 else None
+    nice = env_int("NICE")
+    if nice is not None:
+        fields["nice"] = nice
+
+    ionice = os.environ.get(prefix + "IONICE", "").strip()
+    if ionice:
+        io_class, _, level = ionice.partition(":")
+        try:
+            fields["ionice_class"] = int(io_class) or None
+            if level:
+                fields["ionice_level"] = int(level)
+        except ValueError:
+            pass
+
+    return ResourceProfile(**fields)
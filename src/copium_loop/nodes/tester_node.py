@@ -4,12 +4,20 @@ from langchain_core.messages import SystemMessage
 
 from copium_loop import constants
 from copium_loop.discovery import get_build_command, get_lint_command, get_test_command
+from copium_loop.errors import is_resource_limit_error
 from copium_loop.languages import Command, CompositeCommand
+from copium_loop.limits import get_resource_profile
 from copium_loop.nodes.utils import node_header
 from copium_loop.shell import run_command
 from copium_loop.state import AgentState
 from copium_loop.telemetry import get_telemetry
 
+# Lines worth surfacing from the full log when the captured output was truncated
+TRUNCATED_FAILURE_LINE_PATTERN = (
+    r"^\s*(FAIL|FAILED|ERROR)\b|^E\s|\berror:|\b[1-9]\d* (failed|failing)\b"
+)
+MAX_TRUNCATED_FAILURE_LINES = 50
+
 
 async def _run_stage(
     stage_name: str, cmd_obj: Command | CompositeCommand, telemetry
@@ -25,14 +33,28 @@ async def _run_stage(
     commands = cmd_obj.commands if isinstance(cmd_obj, CompositeCommand) else [cmd_obj]
 
     all_outputs = []
+    full_logs = []
     overall_success = True
     final_exit_code = 0
 
+    resource_profile = get_resource_profile("tester")
+
     for cmd in commands:
-        result = await run_command(cmd.executable, cmd.args, node="tester", cwd=cmd.cwd)
+        # Spill so failures dropped from the middle of huge logs stay searchable
+        result = await run_command(
+            cmd.executable,
+            cmd.args,
+            node="tester",
+            cwd=cmd.cwd,
+            spill=True,
+            resource_profile=resource_profile,
+            heavy=True,
+        )
         output = result["output"]
         exit_code = result["exit_code"]
         all_outputs.append(output)
+        if result.get("log") is not None:
+            full_logs.append(result["log"])
 
         if exit_code != 0:
             overall_success = False
@@ -62,18 +84,50 @@ async def _run_stage(
         if stage_name == "linting":
             failure_patterns.append(r":\d+:(\d+:)?\s*[A-Z]+\d{3,4}\b")
 
+        flags = re.IGNORECASE | re.MULTILINE
         for pattern in failure_patterns:
-            if re.search(pattern, combined_output, re.IGNORECASE | re.MULTILINE):
+            if full_logs:
+                matched = any(log.search(pattern, flags) for log in full_logs)
+            else:
+                matched = re.search(pattern, combined_output, flags)
+            if matched:
                 success = False
                 break
 
     if not success:
         telemetry.log_info("tester", f"{stage_name.capitalize()} failed.\n")
         print(f"{stage_name.capitalize()} failed.")
+        combined_output += _summarize_truncated_logs(full_logs)
 
     return success, combined_output
 
 
+def _failure_type(default: str, output: str) -> str:
+    """Classifies a failed stage, setting resource limit breaches apart."""
+    return "Resource limit" if is_resource_limit_error(output) else default
+
+
+def _summarize_truncated_logs(full_logs: list) -> str:
+    """
+    For outputs too large to capture in memory, lists the failure lines found
+    in the full on-disk log so they are not lost to truncation.
+    """
+    summary = []
+    for log in full_logs:
+        if len(log) <= constants.MAX_OUTPUT_SIZE:
+            continue
+        lines = log.grep(
+            TRUNCATED_FAILURE_LINE_PATTERN,
+            re.IGNORECASE | re.MULTILINE,
+            max_count=MAX_TRUNCATED_FAILURE_LINES,
+        )
+        summary.append(f"\n[Output truncated. Full log: {log.path}]\n")
+        if lines:
+            summary.append("Failure lines from the full log:\n")
+            summary.append("\n".join(lines) + "\n")
+    return "".join(summary)
+
+
 @node_header("tester", status_key="test_output")
 async def tester_node(state: AgentState) -> dict:
     telemetry = get_telemetry()
@@ -86,7 +140,7 @@ async def tester_node(state: AgentState) -> dict:
         success, output = await _run_stage("linting", lint_cmd_obj, telemetry)
         if not success:
             telemetry.log_status("tester", "failed")
-            error_msg = "FAIL (Lint):\n" + output
+            error_msg = f"FAIL ({_failure_type('Lint', output)}):\n" + output
             return {
                 "test_output": error_msg,
                 "retry_count": retry_count + 1,
@@ -104,7 +158,7 @@ async def tester_node(state: AgentState) -> dict:
         success, output = await _run_stage("build", build_cmd_obj, telemetry)
         if not success:
             telemetry.log_status("tester", "failed")
-            error_msg = "FAIL (Build):\n" + output
+            error_msg = f"FAIL ({_failure_type('Build', output)}):\n" + output
             return {
                 "test_output": error_msg,
                 "retry_count": retry_count + 1,
@@ -136,7 +190,9 @@ async def tester_node(state: AgentState) -> dict:
                 re.search(p, output, re.MULTILINE) for p in coverage_patterns
             )
 
-            fail_type = "Coverage" if is_coverage_failure else "Unit"
+            fail_type = _failure_type(
+                "Coverage" if is_coverage_failure else "Unit", output
+            )
             fail_prefix = f"FAIL ({fail_type}):"
 
             if is_coverage_failure:
@@ -0,0 +1,159 @@
+import contextlib
+import mmap
+import re
+from datetime import datetime
+from pathlib import Path
+
+from copium_loop.constants import MAX_SPILLED_OUTPUTS
+from copium_loop.telemetry import get_telemetry
+
+
+def get_output_dir() -> Path:
+    """Returns the directory that holds spilled command outputs for this session."""
+    try:
+        telemetry = get_telemetry()
+    except RuntimeError:
+        return Path.home() / ".copium" / "outputs" / "default"
+    # Outputs live next to the logs so they follow the same ~/.copium root
+    return telemetry.log_dir.parent / "outputs" / telemetry.session_id
+
+
+class OutputLog:
+    """
+    Full, untruncated output of a single command invocation, spilled to disk.
+
+    The file is written while the command streams and read back through
+    `mmap`, so callers can search a multi-gigabyte test log without holding
+    it in memory. The file is kept after the command exits for inspection.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+
+    @classmethod
+    def create(cls, label: str, output_dir: Path | None = None) -> "OutputLog":
+        """Creates a new, empty spill file for a command named `label`."""
+        output_dir = output_dir or get_output_dir()
+        output_dir.mkdir(parents=True, exist_ok=True)
+        _prune(output_dir, keep=MAX_SPILLED_OUTPUTS - 1)
+
+        safe_label = re.sub(r"[^\w.-]", "_", Path(label).name) or "command"
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        log = cls(output_dir / f"{stamp}-{safe_label}.log")
+        # Large buffer: writes happen on the event loop thread while streaming
+        log._file = open(log.path, "wb", buffering=64 * 1024)  # noqa: SIM115
+        return log
+
+    def write(self, text: str):
+        """Appends text to the spill file."""
+        if self._file and text:
+            self._file.write(text.encode("utf-8", errors="replace"))
+
+    def close(self):
+        """Flushes and closes the spill file. Reads are valid afterwards."""
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        """Size of the spilled output in bytes."""
+        try:
+            return self.path.stat().st_size
+        except OSError:
+            return 0
+
+    def __getitem__(self, index: slice) -> str:
+        """Returns a byte-range slice of the output, decoded as text."""
+        if not isinstance(index, slice):
+            raise TypeError("OutputLog only supports slice access")
+        with self._map() as mm:
+            return mm[index].decode("utf-8", errors="replace") if mm else ""
+
+    def head(self, n: int = 20) -> str:
+        """Returns the first `n` lines of the output."""
+        with self._map() as mm:
+            if not mm or n <= 0:
+                return ""
+            end = -1
+            for _ in range(n):
+                end = mm.find(b"\n", end + 1)
+                if end == -1:
+                    end = len(mm) - 1
+                    break
+            return mm[: end + 1].decode("utf-8", errors="replace")
+
+    def tail(self, n: int = 20) -> str:
+        """Returns the last `n` lines of the output."""
+        with self._map() as mm:
+            if not mm or n <= 0:
+                return ""
+            # Ignore the final newline so it does not count as an empty line
+            start = len(mm) - 1 if mm[-1:] == b"\n" else len(mm)
+            for _ in range(n):
+                start = mm.rfind(b"\n", 0, start)
+                if start == -1:
+                    break
+            return mm[start + 1 :].decode("utf-8", errors="replace")
+
+    def search(self, pattern: str, flags: int = 0) -> bool:
+        """Returns True if `pattern` matches anywhere in the output."""
+        regex = re.compile(pattern.encode("utf-8"), flags)
+        with self._map() as mm:
+            return bool(mm) and regex.search(mm) is not None
+
+    def grep(
+        self, pattern: str, flags: int = 0, max_count: int | None = None
+    ) -> list[str]:
+        """Returns the lines that match `pattern`, in order, without newlines."""
+        regex = re.compile(pattern.encode("utf-8"), flags)
+        lines = []
+        with self._map() as mm:
+            if not mm:
+                return lines
+            pos = 0
+            while max_count is None or len(lines) < max_count:
+                match = regex.search(mm, pos)
+                if not match:
+                    break
+                line_start = mm.rfind(b"\n", 0, match.start()) + 1
+                line_end = mm.find(b"\n", match.end())
+                if line_end == -1:
+                    line_end = len(mm)
+                lines.append(mm[line_start:line_end].decode("utf-8", errors="replace"))
+                # Continue after this line so each line is reported once
+                pos = line_end + 1
+                if pos > len(mm):
+                    break
+        return lines
+
+    @contextlib.contextmanager
+    def _map(self):
+        """Maps the file read-only; yields None for a missing or empty file."""
+        try:
+            f = open(self.path, "rb")  # noqa: SIM115
+        except OSError:
+            yield None
+            return
+        with f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files cannot be mapped
+                yield None
+                return
+            with mm:
+                yield mm
+
+    def __repr__(self) -> str:
+        return f"OutputLog({str(self.path)!r})"
+
+
+def _prune(output_dir: Path, keep: int):
+    """Deletes the oldest spill files so that at most `keep` remain."""
+    try:
+        files = sorted(p for p in output_dir.iterdir() if p.suffix == ".log")
+    except OSError:
+        return
+    for old in files[: max(len(files) - keep, 0)]:
+        old.unlink(missing_ok=True)
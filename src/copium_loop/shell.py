@@ -1,16 +1,30 @@
 import asyncio
+import codecs
 import contextlib
+import functools
 import os
 import re
+import resource
+import signal
 import subprocess
 import sys
 import time
+from collections import deque
+from collections.abc import Sequence
 
 from copium_loop.constants import (
     COMMAND_TIMEOUT,
     INACTIVITY_TIMEOUT,  # noqa: F401
     MAX_OUTPUT_SIZE,
+    OUTPUT_FLUSH_INTERVAL,
+    OUTPUT_FLUSH_SIZE,
+    PROCESS_GROUP_GRACE_PERIOD,
+    STREAM_READ_MAX_SIZE,
+    STREAM_READ_MIN_SIZE,
 )
+from copium_loop.governor import get_heavy_command_semaphore
+from copium_loop.limits import ResourceProfile
+from copium_loop.output_log import OutputLog
 from copium_loop.telemetry import get_telemetry
 
 # Expanded ANSI escape code regex to cover CSI, OSC, DCS, Fe, Fs sequences
@@ -27,36 +41,329 @@ ANSI_ESCAPE_RE = re.compile(
 
 CONTROL_CHAR_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]")
 
+# Same set as CONTROL_CHAR_RE, for deleting from raw bytes
+CONTROL_BYTES = bytes([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+
+# Control characters minus BEL and ESC, which delimit escape sequences
+ESCAPE_SAFE_CONTROL_CHAR_RE = re.compile(
+    r"[\x00-\x06\x08\x0B\x0C\x0E-\x1A\x1C-\x1F\x7F]"
+)
+ESCAPE_SAFE_CONTROL_BYTES = CONTROL_BYTES.translate(None, b"\x07\x1b")
+
+# An escape sequence that has started but not yet terminated at end of input
+ANSI_INCOMPLETE_RE = re.compile(
+    r"""
+    \x1B\Z                               | # bare ESC
+    \x1B\[[0-?]*[ -/]*\Z                 | # CSI
+    \x1B[\]P^_](?:(?!\x07|\x1B\\).)*\Z   | # OSC, DCS, PM, APC
+    \x1B[ -/]\Z                          # Fs/Fp/nF
+""",
+    re.VERBOSE | re.DOTALL,
+)
+
+# Unterminated OSC/DCS/PM/APC string; searched for, as it may span earlier ESCs
+ANSI_OPEN_STRING_RE = re.compile(r"\x1B[\]P^_](?:(?!\x07|\x1B\\).)*\Z", re.DOTALL)
+
 
 class StreamBuffer:
-    """Handles accumulation and truncation of stream output."""
+    """
+    Bounded, append-only segment log for subprocess output.
+
+    Every chunk is stored once, tagged with the stream it came from, so the
+    stdout, stderr and interleaved views are all derived from the same
+    segments on demand. The first `head_size` characters are kept verbatim;
+    after that a rolling tail of `max_size - head_size` characters is kept in
+    a deque, so the end of a long log (test summaries, `VERDICT:` lines)
+    survives while memory stays flat. Appends never re-join accumulated text.
+    """
+
+    STREAM_LABELS = {"stdout": "Output", "stderr": "Error"}
 
-    def __init__(self, max_size: int, label: str):
+    def __init__(self, max_size: int, label: str, head_size: int | None = None):
         self.max_size = max_size
         self.label = label
-        self.chunks = []
-        self.current_size = 0
+        if head_size is None:
+            head_size = max_size // 4
+        self.head_size = min(head_size, max_size)
+        self.tail_size = max_size - self.head_size
+        self.head_chunks: list[tuple[str, str]] = []
+        self.head_len = 0
+        self.tail_chunks: deque[tuple[str, str]] = deque()
+        self.tail_len = 0
+        self.dropped = 0
+        self.dropped_by_stream: dict[str, int] = {}
         self.truncated = False
 
-    def append(self, chunk: str):
-        """Appends a chunk, truncating if max_size is exceeded."""
-        if self.truncated or not chunk:
+    def _drop(self, stream: str, count: int):
+        self.dropped += count
+        self.dropped_by_stream[stream] = self.dropped_by_stream.get(stream, 0) + count
+        self.truncated = True
+
+    def append(self, chunk: str, stream: str = "stdout"):
+        """Appends a chunk, evicting the oldest tail data once max_size is exceeded."""
+        if not chunk:
+            return
+
+        if self.head_len < self.head_size:
+            room = self.head_size - self.head_len
+            if len(chunk) <= room:
+                self.head_chunks.append((stream, chunk))
+                self.head_len += len(chunk)
+                return
+            self.head_chunks.append((stream, chunk[:room]))
+            self.head_len = self.head_size
+            chunk = chunk[room:]
+
+        if len(chunk) >= self.tail_size:
+            # A single chunk replaces the whole tail
+            for old_stream, old_text in self.tail_chunks:
+                self._drop(old_stream, len(old_text))
+            self.tail_chunks.clear()
+            self.tail_len = 0
+            excess = len(chunk) - self.tail_size
+            if excess:
+                self._drop(stream, excess)
+                chunk = chunk[excess:]
+            if chunk:
+                self.tail_chunks.append((stream, chunk))
+                self.tail_len = len(chunk)
+            return
+
+        self.tail_chunks.append((stream, chunk))
+        self.tail_len += len(chunk)
+        excess = self.tail_len - self.tail_size
+        while excess > 0:
+            oldest_stream, oldest = self.tail_chunks[0]
+            if len(oldest) <= excess:
+                self.tail_chunks.popleft()
+                dropped = len(oldest)
+            else:
+                self.tail_chunks[0] = (oldest_stream, oldest[excess:])
+                dropped = excess
+            self.tail_len -= dropped
+            self._drop(oldest_stream, dropped)
+            excess -= dropped
+
+    def get_content(self, stream: str | None = None) -> str:
+        """
+        Materializes the content of one stream, or of all streams interleaved
+        when `stream` is None, with a marker where data was dropped.
+        """
+        if stream is None:
+            head = "".join(text for _, text in self.head_chunks)
+            tail = "".join(text for _, text in self.tail_chunks)
+            dropped = self.dropped
+            label = self.label
+        else:
+            head = "".join(text for s, text in self.head_chunks if s == stream)
+            tail = "".join(text for s, text in self.tail_chunks if s == stream)
+            dropped = self.dropped_by_stream.get(stream, 0)
+            label = self.STREAM_LABELS.get(stream, stream)
+
+        if not dropped:
+            return head + tail
+        return f"{head}\n[... {label} Truncated ...]\n{tail}"
+
+
+class CommandUsage:
+    """
+    Resource accounting for one `stream_subprocess` call.
+
+    CPU time and peak RSS are `getrusage(RUSAGE_CHILDREN)` deltas across the
+    command, since asyncio reaps the child itself and `wait4` is unavailable.
+    They therefore include any descendants the child waited for, and any other
+    subprocess reaped concurrently. Peak RSS is only known when the command
+    raised the children's high-water mark, and is omitted otherwise.
+    """
+
+    def __init__(self, command: str):
+        self.command = os.path.basename(command)
+        self.stdout_bytes = 0
+        self.stderr_bytes = 0
+        self.exit_reason = ""
+        self.metrics: dict[str, float] = {}
+        self._start_time = time.monotonic()
+        self._start = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    def finish(self, exit_reason: str) -> dict[str, float]:
+        """Closes the measurement and returns the metrics by name."""
+        end = resource.getrusage(resource.RUSAGE_CHILDREN)
+        self.exit_reason = exit_reason
+        self.metrics = {
+            "command_wall_time": time.monotonic() - self._start_time,
+            "command_cpu_user": end.ru_utime - self._start.ru_utime,
+            "command_cpu_sys": end.ru_stime - self._start.ru_stime,
+            "command_stdout_bytes": self.stdout_bytes,
+            "command_stderr_bytes": self.stderr_bytes,
+        }
+        if end.ru_maxrss > self._start.ru_maxrss:
+            # ru_maxrss is in KiB on Linux but in bytes on macOS
+            scale = 1024 if sys.platform == "darwin" else 1
+            self.metrics["command_peak_rss_kb"] = end.ru_maxrss // scale
+        return self.metrics
+
+    def log(self, node: str):
+        """Emits the metrics for `node`, labelled with command and exit reason."""
+        telemetry = get_telemetry()
+        labels = {"command": self.command, "exit_reason": self.exit_reason}
+        for name, value in self.metrics.items():
+            telemetry.log_metric(node, name, value, labels=labels)
+
+
+class SubprocessResult(Sequence):
+    """
+    Outcome of `stream_subprocess`.
+
+    Behaves like the 6-tuple (stdout, stderr, interleaved, exit_code,
+    timed_out, timeout_message) callers have always unpacked, but the three
+    text views are only materialized from the capture log when accessed, so
+    callers that need one view (e.g. `run_command`) never build the others.
+    When spilling was requested, `spill` holds the full, untruncated output.
+    `usage` holds the command's resource accounting, and `limit_exceeded`
+    names the resource profile limit ("cpu" or "memory") the command hit.
+    """
+
+    _FIELDS = (
+        "stdout",
+        "stderr",
+        "interleaved",
+        "exit_code",
+        "timed_out",
+        "timeout_message",
+    )
+
+    def __init__(
+        self,
+        capture: StreamBuffer,
+        exit_code: int,
+        timed_out: bool,
+        timeout_message: str,
+        spill: OutputLog | None = None,
+        reaped_descendants: int | None = None,
+        usage: CommandUsage | None = None,
+        limit_exceeded: str | None = None,
+    ):
+        self.capture = capture
+        self.exit_code = exit_code
+        self.timed_out = timed_out
+        self.timeout_message = timeout_message
+        self.spill = spill
+        self.reaped_descendants = reaped_descendants
+        self.usage = usage
+        self.limit_exceeded = limit_exceeded
+
+    @functools.cached_property
+    def stdout(self) -> str:
+        return self.capture.get_content("stdout")
+
+    @functools.cached_property
+    def stderr(self) -> str:
+        return self.capture.get_content("stderr")
+
+    @functools.cached_property
+    def interleaved(self) -> str:
+        return self.capture.get_content()
+
+    def __len__(self) -> int:
+        return len(self._FIELDS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        return getattr(self, self._FIELDS[index])
+
+    def __repr__(self) -> str:
+        return (
+            f"SubprocessResult(exit_code={self.exit_code}, timed_out={self.timed_out})"
+        )
+
+
+class OutputSink:
+    """
+    Coalescing terminal writer shared by every concurrently streaming subprocess.
+
+    Chunks are buffered and written with a single write+flush once
+    `flush_interval` seconds have passed (scheduled on the running loop) or
+    `max_pending` characters are pending, whichever comes first. Without a
+    running loop every chunk is written through. In quiet mode nothing is
+    echoed at all; capture and telemetry are unaffected.
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        flush_interval: float = OUTPUT_FLUSH_INTERVAL,
+        max_pending: int = OUTPUT_FLUSH_SIZE,
+        quiet: bool = False,
+    ):
+        # Resolved lazily so redirected/captured sys.stdout is honoured
+        self._stream = stream
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.quiet = quiet
+        self._pending: list[str] = []
+        self._pending_len = 0
+        self._handle: asyncio.TimerHandle | None = None
+        self._handle_loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def stream(self):
+        return self._stream if self._stream is not None else sys.stdout
+
+    def write(self, chunk: str):
+        """Queues chunk for the terminal, flushing if the size budget is spent."""
+        if self.quiet or not chunk:
             return
 
-        self.chunks.append(chunk)
-        self.current_size += len(chunk)
+        self._pending.append(chunk)
+        self._pending_len += len(chunk)
+        if self._pending_len >= self.max_pending:
+            self.flush()
+            return
 
-        if self.current_size > self.max_size:
-            full_text = "".join(self.chunks)
-            self.chunks = [
-                full_text[: self.max_size],
-                f"\n[... {self.label} Truncated ...]\n",
-            ]
-            self.truncated = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._handle is not None and self._handle_loop is not loop:
+            # The pending timer belongs to a loop that is gone (another asyncio.run)
+            self.flush()
+            return
+        if self._handle is None:
+            self._handle = loop.call_later(self.flush_interval, self.flush)
+            self._handle_loop = loop
+
+    def flush(self):
+        """Writes everything pending in one go."""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if not self._pending:
+            return
+
+        data = "".join(self._pending)
+        self._pending.clear()
+        self._pending_len = 0
+        stream = self.stream
+        try:
+            stream.write(data)
+            stream.flush()
+        except (OSError, ValueError):
+            # Terminal went away (closed pane, detached pipe); drop the echo
+            pass
+
+
+_output_sink: OutputSink | None = None
 
-    def get_content(self) -> str:
-        """Returns the accumulated (and possibly truncated) content."""
-        return "".join(self.chunks)
+
+def get_output_sink() -> OutputSink:
+    """Returns the process-wide output sink, quiet if COPIUM_QUIET is set."""
+    global _output_sink
+    if _output_sink is None:
+        quiet = os.environ.get("COPIUM_QUIET", "").lower() not in ("", "0", "false")
+        _output_sink = OutputSink(quiet=quiet)
+    return _output_sink
 
 
 class StreamLogger:
@@ -67,30 +374,43 @@ class StreamLogger:
         self.source = source
         self.buffer = ""
         self.telemetry = get_telemetry() if node else None
+        self.sink = get_output_sink()
 
     def process_chunk(self, chunk: str):
-        """Streams chunk to stdout immediately and buffers for telemetry."""
+        """Streams chunk to the shared output sink and buffers for telemetry."""
         if not chunk:
             return
 
-        sys.stdout.write(chunk)
-        sys.stdout.flush()
+        self.sink.write(chunk)
 
         if self.telemetry:
             self.buffer += chunk
-            while "\n" in self.buffer:
-                line, self.buffer = self.buffer.split("\n", 1)
-                self.telemetry.log(self.node, "output", line + "\n", source=self.source)
+            if "\n" in self.buffer:
+                # One split per chunk; large reads can carry thousands of lines
+                *lines, self.buffer = self.buffer.split("\n")
+                for line in lines:
+                    self.telemetry.log(
+                        self.node, "output", line + "\n", source=self.source
+                    )
 
     def flush(self):
-        """Flushes any remaining buffered output to telemetry."""
+        """Flushes pending terminal output and any remaining buffered telemetry."""
+        self.sink.flush()
         if self.telemetry and self.buffer:
             self.telemetry.log(self.node, "output", self.buffer, source=self.source)
             self.buffer = ""
 
 
 class ProcessMonitor:
-    """Monitors a subprocess for total command timeout and inactivity timeout."""
+    """
+    Enforces the total command timeout and the inactivity timeout of a subprocess.
+
+    Both limits are loop-scheduled deadlines rather than a polling loop, so a
+    process that is quietly running costs no wakeups at all. `update_activity`
+    only records a timestamp; when the inactivity deadline fires it re-arms
+    itself at `last_activity + inactivity_timeout` if output arrived meanwhile.
+    The caller is expected to cancel `run()` once the process has exited.
+    """
 
     def __init__(
         self,
@@ -112,40 +432,83 @@ class ProcessMonitor:
         self.last_activity = time.monotonic()
         self.timed_out = False
         self.timeout_message = ""
+        self.reaped_descendants: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._expired: asyncio.Future | None = None
+        self._command_handle: asyncio.TimerHandle | None = None
+        self._inactivity_handle: asyncio.TimerHandle | None = None
 
     def update_activity(self):
         """Resets the inactivity timer."""
         self.last_activity = time.monotonic()
 
+    def _call_after(self, delay: float, callback) -> asyncio.TimerHandle:
+        """Schedules callback `delay` seconds from now on the loop clock."""
+        return self._loop.call_at(self._loop.time() + max(delay, 0), callback)
+
+    def _expire(self, message: str):
+        """Marks the process as timed out and wakes up `run()`."""
+        if self._expired is None or self._expired.done():
+            return
+        self.timed_out = True
+        self.timeout_message = message
+        self._expired.set_result(None)
+
+    def _on_command_deadline(self):
+        self._command_handle = None
+        self._expire(f"Process exceeded command_timeout of {self.command_timeout}s.")
+
+    def _on_inactivity_deadline(self):
+        self._inactivity_handle = None
+        remaining = (self.last_activity + self.inactivity_timeout) - time.monotonic()
+        if remaining > 0:
+            # Output arrived since the timer was armed; push the deadline out.
+            self._inactivity_handle = self._call_after(
+                remaining, self._on_inactivity_deadline
+            )
+            return
+        self._expire(
+            f"No output for {self.inactivity_timeout}s (inactivity_timeout exceeded)."
+        )
+
+    def _cancel_deadlines(self):
+        for handle in (self._command_handle, self._inactivity_handle):
+            if handle:
+                handle.cancel()
+        self._command_handle = None
+        self._inactivity_handle = None
+
     async def run(self):
-        """Polls the process until it finishes or a timeout occurs."""
-        while self.process.returncode is None:
-            now = time.monotonic()
-
-            # Check for command timeout
-            if self.command_timeout and (now - self.start_time) > self.command_timeout:
-                self.timed_out = True
-                self.timeout_message = (
-                    f"Process exceeded command_timeout of {self.command_timeout}s."
-                )
-                break
+        """Waits until a deadline expires, then kills the process group."""
+        if self.process.returncode is not None:
+            return
 
-            # Check for inactivity timeout
-            if (
-                self.inactivity_timeout
-                and (now - self.last_activity) > self.inactivity_timeout
-            ):
-                self.timed_out = True
-                self.timeout_message = (
-                    f"No output for {self.inactivity_timeout}s "
-                    f"(inactivity_timeout exceeded)."
-                )
-                break
+        self._loop = asyncio.get_running_loop()
+        self._expired = self._loop.create_future()
+        now = time.monotonic()
+
+        # The command deadline is armed first so that it wins a tie with the
+        # inactivity deadline, matching the order the limits are documented in.
+        if self.command_timeout:
+            self._command_handle = self._call_after(
+                self.start_time + self.command_timeout - now,
+                self._on_command_deadline,
+            )
+        if self.inactivity_timeout:
+            self._inactivity_handle = self._call_after(
+                self.last_activity + self.inactivity_timeout - now,
+                self._on_inactivity_deadline,
+            )
 
-            await asyncio.sleep(0.1)
+        try:
+            await self._expired
+        finally:
+            self._cancel_deadlines()
 
         if self.timed_out:
             msg = f"\n[TIMEOUT] {self.timeout_message} Killing process.\n"
+            # Keep the notice after whatever output is still being coalesced
+            get_output_sink().flush()
             print(msg)
             telemetry = get_telemetry()
             if telemetry and self.node:
@@ -157,16 +520,177 @@ class ProcessMonitor:
                 else:
                     self.on_timeout_callback(msg)
 
-            if self.process.returncode is None:
-                try:
-                    self.process.kill()
-                except ProcessLookupError:
-                    pass
-                except Exception as e:
-                    print(
-                        f"[WARNING] Error during process kill on timeout: {e}",
-                        file=sys.stderr,
-                    )
+            try:
+                self.reaped_descendants = await terminate_process_group(self.process)
+            except Exception as e:
+                print(
+                    f"[WARNING] Error during process kill on timeout: {e}",
+                    file=sys.stderr,
+                )
+
+            if self.reaped_descendants:
+                msg = (
+                    f"[TIMEOUT] Reaped {self.reaped_descendants} descendant "
+                    f"process(es) of pid {self.process.pid}.\n"
+                )
+                print(msg, end="")
+                if telemetry and self.node:
+                    telemetry.log(self.node, "info", msg, source="system")
+
+
+def _process_group_members(pgid: int) -> set[int] | None:
+    """
+    Returns the live (non-zombie) pids in a process group, or None when the
+    platform has no /proc to enumerate them.
+    """
+    try:
+        entries = os.scandir("/proc")
+    except OSError:
+        return None
+
+    members = set()
+    with entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # Fields after the parenthesised command name: state ppid pgrp ...
+            fields = stat[stat.rfind(b")") + 2 :].split()
+            if len(fields) > 2 and fields[0] != b"Z" and int(fields[2]) == pgid:
+                members.add(int(entry.name))
+    return members
+
+
+def _process_group_alive(pgid: int) -> bool:
+    members = _process_group_members(pgid)
+    if members is not None:
+        return bool(members)
+    try:
+        os.killpg(pgid, 0)
+    except (ProcessLookupError, PermissionError):
+        return False
+    return True
+
+
+async def terminate_process_group(
+    process: asyncio.subprocess.Process,
+    grace_period: float | None = None,
+) -> int | None:
+    """
+    Terminates a subprocess started by `stream_subprocess` together with every
+    descendant in its process group: SIGTERM first, then SIGKILL for whatever
+    is still alive after `grace_period` seconds.
+
+    Returns the number of descendants (excluding the child itself) that were
+    reaped, or None when they cannot be enumerated on this platform.
+    """
+    if grace_period is None:
+        grace_period = PROCESS_GROUP_GRACE_PERIOD
+
+    pgid = process.pid
+    try:
+        if pgid == os.getpgrp():
+            raise OSError("refusing to signal our own process group")
+        descendants = _process_group_members(pgid)
+        os.killpg(pgid, signal.SIGTERM)
+    except ProcessLookupError:
+        return 0
+    except (TypeError, OSError):
+        # Not a group leader we can signal; fall back to the direct child
+        if process.returncode is None:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+        return None
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + grace_period
+    while _process_group_alive(pgid) and loop.time() < deadline:
+        await asyncio.sleep(0.05)
+
+    if _process_group_alive(pgid):
+        with contextlib.suppress(ProcessLookupError, PermissionError):
+            os.killpg(pgid, signal.SIGKILL)
+        # SIGKILL is asynchronous; give the kernel a moment to tear down
+        deadline = loop.time() + 1.0
+        while _process_group_alive(pgid) and loop.time() < deadline:
+            await asyncio.sleep(0.01)
+
+    if descendants is None:
+        return None
+    descendants.discard(pgid)
+    return len(descendants - (_process_group_members(pgid) or set()))
+
+
+class StreamCleaner:
+    """
+    Incremental decoder and ANSI/control-character stripper for one stream.
+
+    UTF-8 characters and escape sequences that straddle read boundaries are
+    held back until the next chunk completes them, instead of being mangled
+    the way per-chunk cleaning does. Chunks without an ESC byte skip the
+    escape-sequence regex entirely: their control bytes are deleted with
+    `bytes.translate` before decoding.
+    """
+
+    # Longest unterminated escape sequence carried over between chunks;
+    # anything longer is treated as garbage and stripped as-is.
+    MAX_PENDING = 4096
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+
+    def feed(self, chunk: str | bytes) -> str:
+        """Returns the cleaned text that is complete after this chunk."""
+        if isinstance(chunk, bytes):
+            # Control bytes are ASCII and never part of a multi-byte UTF-8
+            # character, so they can be dropped before decoding. ESC and BEL
+            # delimit escape sequences and have to survive until those are parsed.
+            if not self._pending and b"\x1b" not in chunk:
+                return self._decoder.decode(chunk.translate(None, CONTROL_BYTES))
+            chunk = chunk.translate(None, ESCAPE_SAFE_CONTROL_BYTES)
+            text = self._decoder.decode(chunk)
+        else:
+            text = ESCAPE_SAFE_CONTROL_CHAR_RE.sub("", str(chunk))
+        if self._pending:
+            text = self._pending + text
+            self._pending = ""
+
+        if "\x1b" not in text:
+            return text.replace("\x07", "")
+
+        start = self._incomplete_escape_start(text)
+        if start is not None:
+            self._pending = text[start:]
+            text = text[:start]
+        return self._strip_escapes(text)
+
+    @staticmethod
+    def _strip_escapes(text: str) -> str:
+        # Other control characters are gone already; drop stray ESC/BEL too
+        return ANSI_ESCAPE_RE.sub("", text).replace("\x1b", "").replace("\x07", "")
+
+    def _incomplete_escape_start(self, text: str) -> int | None:
+        """Index of an escape sequence left open at the end of text, if any."""
+        floor = max(len(text) - self.MAX_PENDING, 0)
+        # String sequences (OSC, DCS, ...) may contain ESC before their terminator
+        match = ANSI_OPEN_STRING_RE.search(text, floor)
+        if match:
+            return match.start()
+        last = text.rfind("\x1b", floor)
+        if last >= 0 and ANSI_INCOMPLETE_RE.match(text, last):
+            return last
+        return None
+
+    def finish(self) -> str:
+        """Flushes whatever is still held back once the stream has ended."""
+        text = self._pending + self._decoder.decode(b"", final=True)
+        self._pending = ""
+        return self._strip_escapes(text)
 
 
 def _clean_chunk(chunk: str | bytes) -> str:
@@ -201,20 +725,44 @@ async def stream_subprocess(
     on_timeout_callback=None,
     source: str = "system",
     cwd: str | None = None,
-) -> tuple[str, str, str, int, bool, str]:
+    spill: bool = False,
+    resource_profile: ResourceProfile | None = None,
+) -> SubprocessResult:
     """
     Common helper to execute a subprocess and stream its output.
-    Returns (stdout, stderr, interleaved, exit_code, timed_out, timeout_message).
+    Returns a SubprocessResult, which unpacks as
+    (stdout, stderr, interleaved, exit_code, timed_out, timeout_message).
+    If spill is True, the complete interleaved output is also streamed to a
+    file under ~/.copium/outputs/<session>/ and returned as `result.spill`.
+    On timeout the child's whole process group is terminated and the number
+    of reaped descendants is reported as `result.reaped_descendants`.
+    Wall time, CPU, peak RSS and output volume are returned as `result.usage`
+    and, when a node is given, logged to telemetry as metrics.
+    A resource_profile limits the child's memory, CPU time and priority; a
+    failure caused by one of its limits is reported as `result.limit_exceeded`.
     """
     stderr_target = subprocess.PIPE if capture_stderr else subprocess.DEVNULL
+    usage = CommandUsage(command)
+
+    limits = {}
+    if resource_profile:
+        limits["preexec_fn"] = resource_profile.preexec_fn()
 
+    # Each child leads its own session/process group so that a timeout or
+    # cancellation can take down the whole tree (test workers, build daemons).
     process = await asyncio.create_subprocess_exec(
-        command, *args, stdout=subprocess.PIPE, stderr=stderr_target, env=env, cwd=cwd
+        command,
+        *args,
+        stdout=subprocess.PIPE,
+        stderr=stderr_target,
+        env=env,
+        cwd=cwd,
+        start_new_session=True,
+        **limits,
     )
 
-    stdout_buffer = StreamBuffer(MAX_OUTPUT_SIZE, "Output")
-    stderr_buffer = StreamBuffer(MAX_OUTPUT_SIZE, "Error")
-    interleaved_buffer = StreamBuffer(MAX_OUTPUT_SIZE, "Combined")
+    capture = StreamBuffer(MAX_OUTPUT_SIZE, "Combined")
+    spill_log = OutputLog.create(command) if spill else None
 
     logger = StreamLogger(node, source=source)
     start_time = time.monotonic()
@@ -229,24 +777,43 @@ async def stream_subprocess(
         source=source,
     )
 
+    def handle_output(decoded, is_stderr):
+        if spill_log is not None:
+            spill_log.write(decoded)
+        if not is_stderr:
+            logger.process_chunk(decoded)
+            capture.append(decoded, "stdout")
+        else:
+            capture.append(decoded, "stderr")
+
     async def read_stream(stream, is_stderr):
+        cleaner = StreamCleaner()
+        read_size = STREAM_READ_MIN_SIZE
         while True:
             try:
-                chunk = await stream.read(1024)
+                chunk = await stream.read(read_size)
             except (asyncio.CancelledError, Exception):
                 break
             if not chunk:
                 break
 
             monitor.update_activity()
-            decoded = _clean_chunk(chunk)
+            if is_stderr:
+                usage.stderr_bytes += len(chunk)
+            else:
+                usage.stdout_bytes += len(chunk)
+            # Grow while the pipe is saturated, shrink back for interactive trickles
+            if len(chunk) >= read_size:
+                read_size = min(read_size * 2, STREAM_READ_MAX_SIZE)
+            elif len(chunk) < read_size // 4:
+                read_size = max(read_size // 2, STREAM_READ_MIN_SIZE)
+            decoded = cleaner.feed(chunk)
             if decoded:
-                interleaved_buffer.append(decoded)
-                if not is_stderr:
-                    logger.process_chunk(decoded)
-                    stdout_buffer.append(decoded)
-                else:
-                    stderr_buffer.append(decoded)
+                handle_output(decoded, is_stderr)
+
+        tail = cleaner.finish()
+        if tail:
+            handle_output(tail, is_stderr)
 
     read_stdout_task = asyncio.create_task(read_stream(process.stdout, False))
     read_stderr_task = None
@@ -255,6 +822,7 @@ async def stream_subprocess(
 
     monitor_task = asyncio.create_task(monitor.run())
 
+    cancelled = False
     try:
         wait_task = asyncio.create_task(process.wait())
         done, pending = await asyncio.wait(
@@ -268,22 +836,23 @@ async def stream_subprocess(
             with contextlib.suppress(asyncio.CancelledError):
                 await wait_task  # Await to clean up the task
 
+        # The child may exit on SIGTERM while the monitor is still escalating
+        # against its descendants; let the group teardown finish.
+        if monitor.timed_out and not monitor_task.done():
+            await monitor_task
+
     except asyncio.CancelledError:
-        # If the stream_subprocess task itself is cancelled, ensure we kill the process
-        if process.returncode is None:
-            with contextlib.suppress(ProcessLookupError):
-                process.kill()
+        # If the stream_subprocess task itself is cancelled, kill the process tree
+        cancelled = True
+        await terminate_process_group(process, grace_period=0)
         raise
     finally:
-        # Final cleanup: ensure process is reaped and monitor/readers are stopped
+        # Final cleanup: ensure the process tree is gone and reaped
         if process.returncode is None:
-            try:
-                process.kill()
-                # Use communicate() wrapped in wait_for to avoid hanging on pipes held by descendants
-                with contextlib.suppress(asyncio.TimeoutError, Exception):
-                    await asyncio.wait_for(process.communicate(), timeout=0.5)
-            except (ProcessLookupError, Exception):
-                pass
+            with contextlib.suppress(Exception):
+                await terminate_process_group(process, grace_period=0)
+            with contextlib.suppress(asyncio.TimeoutError, Exception):
+                await asyncio.wait_for(process.wait(), timeout=0.5)
 
         # Stop reader tasks and monitor task
         for task in [read_stdout_task, read_stderr_task, monitor_task]:
@@ -296,23 +865,45 @@ async def stream_subprocess(
                     await task
 
         logger.flush()
-
-    stdout = stdout_buffer.get_content()
-    stderr = stderr_buffer.get_content()
-    interleaved = interleaved_buffer.get_content()
+        if spill_log is not None:
+            spill_log.close()
+
+        if monitor.timed_out:
+            exit_reason = "timeout"
+        elif cancelled:
+            exit_reason = "cancelled"
+        elif isinstance(process.returncode, int) and process.returncode < 0:
+            exit_reason = "signal"
+        else:
+            exit_reason = "exit"
+        usage.finish(exit_reason)
+        limit_exceeded = None
+        if resource_profile and exit_reason in ("exit", "signal"):
+            metrics = usage.metrics
+            limit_exceeded = resource_profile.classify_failure(
+                process.returncode,
+                metrics["command_cpu_user"] + metrics["command_cpu_sys"],
+                capture.get_content(),
+            )
+            if limit_exceeded:
+                usage.exit_reason = f"{limit_exceeded}_limit"
+        if node:
+            usage.log(node)
 
     if monitor.timed_out:
         exit_code = -1
     else:
         exit_code = process.returncode if process.returncode is not None else 0
 
-    return (
-        stdout,
-        stderr,
-        interleaved,
+    return SubprocessResult(
+        capture,
         exit_code,
         monitor.timed_out,
         monitor.timeout_message,
+        spill=spill_log,
+        reaped_descendants=monitor.reaped_descendants,
+        usage=usage,
+        limit_exceeded=limit_exceeded,
     )
 
 
@@ -324,10 +915,19 @@ async def run_command(
     capture_stderr: bool = True,
     source: str = "system",
     cwd: str | None = None,
+    spill: bool = False,
+    resource_profile: ResourceProfile | None = None,
+    heavy: bool = False,
 ) -> dict:
     """
     Invokes a shell command and streams output to stdout.
     Returns the combined stdout/stderr output and exit code.
+    If spill is True, the full output is kept on disk and returned under "log"
+    as an OutputLog, since "output" is capped at MAX_OUTPUT_SIZE.
+    If the command fails by hitting a limit of resource_profile, the output
+    ends with a "[LIMIT]" line and the limit is returned under "limit_exceeded".
+    Heavy commands (tests, builds, installs) first wait for one of the
+    host-wide heavy-command slots shared by all sessions; light ones bypass it.
     If command_timeout is provided, the process will be killed if it runs longer than command_timeout.
     If inactivity_timeout is exceeded (no output for INACTIVITY_TIMEOUT seconds), the process will be killed.
     """
@@ -356,25 +956,41 @@ async def run_command(
     async def on_timeout(msg):
         timeout_msg_list.append(msg)
 
-    (
-        stdout,
-        stderr,
-        interleaved,
-        exit_code,
-        timed_out,
-        timeout_message,
-    ) = await stream_subprocess(
-        command,
-        args,
-        env,
-        node,
-        command_timeout,
-        inactivity_timeout=INACTIVITY_TIMEOUT,
-        capture_stderr=capture_stderr,
-        on_timeout_callback=on_timeout,
-        source=source,
-        cwd=cwd,
+    def on_queued():
+        msg = f"Waiting for a free heavy-command slot to run {command}...\n"
+        print(msg, end="")
+        if node:
+            get_telemetry().log_info(node, msg)
+
+    slot = (
+        get_heavy_command_semaphore().acquire(on_wait=on_queued)
+        if heavy
+        else contextlib.nullcontext()
     )
+    async with slot as queue_wait:
+        if heavy and node:
+            get_telemetry().log_metric(
+                node,
+                "command_queue_wait",
+                queue_wait,
+                labels={"command": os.path.basename(command)},
+            )
+        result = await stream_subprocess(
+            command,
+            args,
+            env,
+            node,
+            command_timeout,
+            inactivity_timeout=INACTIVITY_TIMEOUT,
+            capture_stderr=capture_stderr,
+            on_timeout_callback=on_timeout,
+            source=source,
+            cwd=cwd,
+            spill=spill,
+            resource_profile=resource_profile,
+        )
+    # Only the interleaved view is needed; slicing skips the per-stream views
+    interleaved, exit_code, timed_out, timeout_message = result[2:]
 
     # Use interleaved output for backward compatibility
     full_output = interleaved
@@ -385,6 +1001,20 @@ async def run_command(
         if timeout_msg_list:
             full_output += "".join(timeout_msg_list)
         full_output += " Killing process.\n"
+        # Test doubles of stream_subprocess may return a plain tuple
+        reaped = getattr(result, "reaped_descendants", None)
+        if reaped:
+            full_output += f"[TIMEOUT] Reaped {reaped} descendant process(es).\n"
         final_exit_code = -1
 
-    return {"output": full_output, "exit_code": final_exit_code}
+    response = {"output": full_output, "exit_code": final_exit_code}
+    limit_exceeded = getattr(result, "limit_exceeded", None)
+    if limit_exceeded:
+        response["output"] += (
+            f"\n[LIMIT] Process exceeded its "
+            f"{resource_profile.describe(limit_exceeded)}.\n"
+        )
+        response["limit_exceeded"] = limit_exceeded
+    if spill:
+        response["log"] = result.spill
+    return response
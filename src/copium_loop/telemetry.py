@@ -64,9 +64,21 @@ class Telemetry:
         """Logs a status change for a node (e.g., 'active', 'idle', 'error', 'success')."""
         self.log(node, "status", status, source="system")
 
-    def log_metric(self, node: str, metric_name: str, value: float):
-        """Logs a metric for a node (e.g., 'latency', 'tokens')."""
-        self.log(node, "metric", {"name": metric_name, "value": value}, source="system")
+    def log_metric(
+        self,
+        node: str,
+        metric_name: str,
+        value: float,
+        labels: dict[str, str] | None = None,
+    ):
+        """
+        Logs a metric for a node (e.g., 'latency', 'tokens'), optionally with
+        labels such as the command it was measured for.
+        """
+        data = {"name": metric_name, "value": value}
+        if labels:
+            data["labels"] = labels
+        self.log(node, "metric", data, source="system")
 
     def log_workflow_status(self, status: str):
         """Logs a workflow-level status change (e.g., 'running', 'success', 'failed')."""
@@ -164,7 +164,7 @@ async def workon_main(issue_input: str, tmux: TmuxManager):
                 "pnpm project detected, but pnpm is not installed. Please install pnpm: https://pnpm.io/"
             )
         print("pnpm project detected. Running pnpm install...")
-        await run_command("pnpm", ["install"], cwd=workspace_path)
+        await run_command("pnpm", ["install"], cwd=workspace_path, heavy=True)
 
     # 5. Orchestrate tmux session
     if not tmux.has_session(branch_name):
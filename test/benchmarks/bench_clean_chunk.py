@@ -0,0 +1,76 @@
+"""
+Microbenchmark: throughput of subprocess output cleaning in MB/s.
+
+Feeds synthetic logs, split into the 1024-byte reads `stream_subprocess` does,
+through the legacy per-chunk `_clean_chunk` and through a `StreamCleaner`.
+Also counts how many outputs differ from cleaning the whole log at once, i.e.
+how often an escape sequence or UTF-8 character was mangled at a boundary.
+
+Usage:
+    python test/benchmarks/bench_clean_chunk.py [--size-mb N] [--repeat R]
+"""
+
+import argparse
+import time
+
+from copium_loop import shell
+
+PLAIN_LINE = "test/test_shell.py::test_stream_subprocess_output PASSED   [ 42%]\n"
+COLOR_LINE = (
+    "\x1b[32mtest/test_shell.py::test_stream_subprocess_output \x1b[1mPASSED"
+    "\x1b[0m   [ 42%] ✔ résumé\n"
+)
+
+
+def make_log(line: str, size: int) -> bytes:
+    data = line.encode("utf-8")
+    return data * (size // len(data) + 1)
+
+
+def split(data: bytes, size: int = 1024) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def legacy(chunks: list[bytes]) -> str:
+    return "".join(shell._clean_chunk(chunk) for chunk in chunks)
+
+
+def streaming(chunks: list[bytes]) -> str:
+    cleaner = shell.StreamCleaner()
+    return "".join(cleaner.feed(chunk) for chunk in chunks) + cleaner.finish()
+
+
+def measure(func, chunks: list[bytes], repeat: int) -> float:
+    """Returns the best throughput in MB/s over `repeat` runs."""
+    total = sum(len(chunk) for chunk in chunks)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(chunks)
+        best = min(best, time.perf_counter() - start)
+    return total / best / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    for name, line in (("plain", PLAIN_LINE), ("ansi+utf8", COLOR_LINE)):
+        data = make_log(line, size)
+        chunks = split(data)
+        expected = shell._clean_chunk(data)
+        print(f"{name} log, {len(data) / 1e6:.1f} MB in {len(chunks)} reads")
+        for label, func in (("_clean_chunk", legacy), ("StreamCleaner", streaming)):
+            mbps = measure(func, chunks, args.repeat)
+            mangled = func(chunks) != expected
+            print(
+                f"  {label:<14} {mbps:8.1f} MB/s"
+                f"  {'mangled at boundaries' if mangled else 'exact'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
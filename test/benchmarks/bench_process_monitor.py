@@ -0,0 +1,113 @@
+"""
+Microbenchmark: event-loop wakeups per monitored process.
+
+Runs N idle ProcessMonitor instances (fake processes that never exit and never
+produce output) on an event loop whose selector counts how often `select()`
+returns, i.e. how often the loop wakes up. The legacy 100 ms polling monitor is
+measured the same way for comparison.
+
+Usage:
+    python test/benchmarks/bench_process_monitor.py [--processes N] [--seconds S]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import selectors
+import time
+
+from copium_loop import shell
+
+
+class CountingSelector(selectors.DefaultSelector):
+    """Selector that counts how many times the event loop woke up."""
+
+    def __init__(self):
+        super().__init__()
+        self.wakeups = 0
+
+    def select(self, timeout=None):
+        events = super().select(timeout)
+        self.wakeups += 1
+        return events
+
+
+class IdleProcess:
+    """Stands in for a subprocess that stays alive and silent."""
+
+    returncode = None
+
+    def kill(self):
+        pass
+
+
+async def legacy_monitor(process, timeout: float):
+    """The 100 ms polling loop that ProcessMonitor.run used to implement."""
+    start = time.monotonic()
+    while process.returncode is None:
+        if time.monotonic() - start > timeout:
+            break
+        await asyncio.sleep(0.1)
+
+
+async def run_monitors(
+    selector: CountingSelector, count: int, seconds: float, legacy: bool
+) -> int:
+    """Returns the number of wakeups observed while all monitors sat idle."""
+    tasks = []
+    for _ in range(count):
+        # Real subprocesses start at arbitrary times, so stagger the monitors
+        # across one polling period instead of letting their timers coalesce.
+        await asyncio.sleep(0.1 / count)
+        process = IdleProcess()
+        if legacy:
+            tasks.append(asyncio.create_task(legacy_monitor(process, 3600)))
+        else:
+            monitor = shell.ProcessMonitor(
+                process,
+                time.monotonic(),
+                command_timeout=3600,
+                inactivity_timeout=600,
+                node=None,
+            )
+            tasks.append(asyncio.create_task(monitor.run()))
+
+    before = selector.wakeups
+    await asyncio.sleep(seconds)
+    wakeups = selector.wakeups - before
+
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    return wakeups
+
+
+def measure(count: int, seconds: float, legacy: bool) -> int:
+    selector = CountingSelector()
+    loop = asyncio.SelectorEventLoop(selector)
+    try:
+        return loop.run_until_complete(run_monitors(selector, count, seconds, legacy))
+    finally:
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=36)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"{args.processes} idle processes monitored for {args.seconds}s")
+    for label, legacy in (("polling (legacy)", True), ("deadlines", False)):
+        wakeups = measure(args.processes, args.seconds, legacy)
+        per_proc = wakeups / args.processes / args.seconds
+        print(
+            f"  {label:<18} {wakeups:>6} wakeups "
+            f"({wakeups / args.seconds:8.1f}/s, {per_proc:6.2f}/s per process)"
+        )
+
+
+if __name__ == "__main__":
+    main()
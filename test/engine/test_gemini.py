@@ -76,3 +76,23 @@ async def test_gemini_engine_includes_stderr_on_failure(mock_stream):
 
     assert "CRITICAL ERROR" in str(excinfo.value)
     assert "Partial result" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+@patch("copium_loop.engine.gemini.stream_subprocess")
+async def test_gemini_engine_reports_resource_limit(mock_stream):
+    """Test that a Gemini CLI killed by its resource limits is classified."""
+    fields = ("", "Killed", "Killed", -24, False, "")
+    result = mock_stream.return_value
+    result.__getitem__.side_effect = fields.__getitem__
+    result.limit_exceeded = "cpu"
+
+    engine = GeminiEngine()
+    with (
+        patch.dict("os.environ", {"COPIUM_GEMINI_CPU_SECONDS": "60"}),
+        pytest.raises(Exception) as excinfo,
+    ):
+        await engine._execute_gemini("Test prompt", None)
+
+    assert "[LIMIT] Process exceeded its CPU time limit of 60s" in str(excinfo.value)
+    assert mock_stream.call_args.kwargs["resource_profile"].cpu_seconds == 60
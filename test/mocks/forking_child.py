@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Test fixture: a process that forks worker children and then idles, like
+`pytest -n auto` or `npm test` do. Prints one "WORKER <pid>" line per child.
+
+Usage: forking_child.py [--workers N] [--ignore-term] [--grandchildren]
+"""
+
+import os
+import signal
+import sys
+import time
+
+
+def idle_forever():
+    while True:
+        time.sleep(0.1)
+
+
+def spawn_worker(ignore_term: bool, grandchild: bool) -> int:
+    pid = os.fork()
+    if pid == 0:
+        if ignore_term:
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        if grandchild:
+            inner = spawn_worker(ignore_term, grandchild=False)
+            print(f"WORKER {inner}", flush=True)
+        idle_forever()
+    return pid
+
+
+def main():
+    args = sys.argv[1:]
+    workers = int(args[args.index("--workers") + 1]) if "--workers" in args else 2
+    ignore_term = "--ignore-term" in args
+    grandchildren = "--grandchildren" in args
+
+    for _ in range(workers):
+        pid = spawn_worker(ignore_term, grandchildren)
+        print(f"WORKER {pid}", flush=True)
+    print("READY", flush=True)
+    idle_forever()
+
+
+if __name__ == "__main__":
+    main()
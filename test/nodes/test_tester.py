@@ -122,6 +122,30 @@ class TestTesterNode:
             assert mock_run.call_count == 3
             mock_log_status.assert_any_call("tester", "failed")
 
+    @pytest.mark.asyncio
+    async def test_tester_classifies_resource_limit_failure(self, agent_state):
+        """Test that a stage killed by its resource limits is reported as such."""
+        with (
+            patch.object(tester_module, "run_command", autospec=True) as mock_run,
+            patch.object(tester_module, "get_telemetry"),
+        ):
+            mock_run.side_effect = [
+                {"output": "Linting passed", "exit_code": 0},
+                {
+                    "output": "MemoryError\n[LIMIT] Process exceeded its "
+                    "memory limit of 512 MB.\n",
+                    "exit_code": 1,
+                    "limit_exceeded": "memory",
+                },
+            ]
+            agent_state["retry_count"] = 0
+            result = await tester(agent_state)
+
+            assert "FAIL (Resource limit)" in result["test_output"]
+            assert result["retry_count"] == 1
+            profile = mock_run.call_args.kwargs["resource_profile"]
+            assert profile.nice is not None
+
     @pytest.mark.asyncio
     async def test_tester_false_positive_avoidance(self, agent_state):
         """Test that '0 failed' or 'failed' in test names don't trigger failure with exit code 0."""
@@ -422,3 +446,37 @@ class TestTesterNode:
             agent_state["retry_count"] = 0
             result = await tester(agent_state)
             assert "FAIL (Lint)" in result["test_output"]
+
+    @pytest.mark.asyncio
+    async def test_tester_searches_full_log_when_output_truncated(
+        self, agent_state, tmp_path
+    ):
+        """Failures dropped from the captured output are found in the spilled log."""
+        from copium_loop.output_log import OutputLog
+
+        full_log = OutputLog.create("npm", output_dir=tmp_path)
+        full_log.write("running tests\n" + "." * 200 + "\n")
+        full_log.write("  3 failed, 10 passed\n")
+        full_log.write("." * 200 + "\ndone\n")
+        full_log.close()
+
+        with (
+            patch.object(tester_module, "run_command", autospec=True) as mock_run,
+            patch.object(tester_module, "get_telemetry"),
+            patch("copium_loop.constants.MAX_OUTPUT_SIZE", 100),
+        ):
+            mock_run.side_effect = [
+                {"output": "Lint clean", "exit_code": 0},
+                {
+                    "output": "running tests\n[... Combined Truncated ...]\ndone\n",
+                    "exit_code": 0,
+                    "log": full_log,
+                },
+            ]
+            agent_state["retry_count"] = 0
+            result = await tester(agent_state)
+
+            assert "FAIL (Unit)" in result["test_output"]
+            assert f"Full log: {full_log.path}" in result["test_output"]
+            assert "  3 failed, 10 passed" in result["test_output"]
+            assert mock_run.call_args.kwargs["spill"] is True
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from copium_loop import governor, shell
+from copium_loop.governor import HostSemaphore
+
+
+@pytest.mark.asyncio
+async def test_host_semaphore_limits_concurrency(tmp_path):
+    """Test no more than `slots` holders run at once."""
+    semaphore = HostSemaphore("test", 2, lock_dir=tmp_path, poll_interval=0.01)
+    active = 0
+    peak = 0
+
+    async def worker():
+        nonlocal active, peak
+        async with semaphore.acquire():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+
+    await asyncio.gather(*(worker() for _ in range(5)))
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_host_semaphore_is_shared_between_instances(tmp_path):
+    """Test separate instances (i.e. sessions) contend for the same lock files."""
+    first = HostSemaphore("test", 1, lock_dir=tmp_path, poll_interval=0.01)
+    second = HostSemaphore("test", 1, lock_dir=tmp_path, poll_interval=0.01)
+    on_wait = MagicMock()
+
+    async with first.acquire() as waited:
+        assert waited < 0.01
+        task = asyncio.create_task(_hold(second, on_wait))
+        await asyncio.sleep(0.05)
+        assert not task.done()
+
+    waited = await asyncio.wait_for(task, 1)
+    on_wait.assert_called_once()
+    assert waited >= 0.05
+
+
+async def _hold(semaphore, on_wait):
+    async with semaphore.acquire(on_wait=on_wait) as waited:
+        return waited
+
+
+@pytest.mark.asyncio
+async def test_host_semaphore_releases_on_error(tmp_path):
+    """Test a slot is freed when the block raises."""
+    semaphore = HostSemaphore("test", 1, lock_dir=tmp_path, poll_interval=0.01)
+
+    with pytest.raises(RuntimeError):
+        async with semaphore.acquire():
+            raise RuntimeError("boom")
+
+    on_wait = MagicMock()
+    async with semaphore.acquire(on_wait=on_wait):
+        pass
+    on_wait.assert_not_called()
+
+
+def test_get_heavy_command_semaphore_reads_env():
+    """Test COPIUM_HEAVY_SLOTS overrides the default slot count."""
+    with (
+        patch.object(governor, "_heavy_command_semaphore", None),
+        patch.dict("os.environ", {"COPIUM_HEAVY_SLOTS": "3"}),
+    ):
+        assert governor.get_heavy_command_semaphore().slots == 3
+
+
+@pytest.mark.asyncio
+async def test_run_command_heavy_logs_queue_wait(tmp_path):
+    """Test heavy commands take a slot and report how long they queued."""
+    semaphore = HostSemaphore("heavy", 1, lock_dir=tmp_path)
+    with (
+        patch("copium_loop.shell.get_heavy_command_semaphore", return_value=semaphore),
+        patch("copium_loop.shell.get_telemetry") as mock_get_telemetry,
+    ):
+        mock_telemetry = MagicMock()
+        mock_get_telemetry.return_value = mock_telemetry
+
+        res = await shell.run_command(
+            sys.executable, ["-c", "print('ok')"], node="tester", heavy=True
+        )
+
+    assert res["exit_code"] == 0
+    queue_wait = [
+        call
+        for call in mock_telemetry.log_metric.call_args_list
+        if call.args[1] == "command_queue_wait"
+    ]
+    assert len(queue_wait) == 1
+    assert queue_wait[0].args[0] == "tester"
+    assert queue_wait[0].kwargs["labels"] == {
+        "command": shell.os.path.basename(sys.executable)
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_command_light_bypasses_governor():
+    """Test light commands never touch the heavy-command semaphore."""
+    with patch("copium_loop.shell.get_heavy_command_semaphore") as mock_get:
+        res = await shell.run_command(sys.executable, ["-c", "print('ok')"])
+
+    assert res["exit_code"] == 0
+    mock_get.assert_not_called()
@@ -0,0 +1,101 @@
+import os
+import signal
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from copium_loop import shell
+from copium_loop.limits import ResourceProfile, get_resource_profile
+
+
+def test_get_resource_profile_defaults():
+    """Test the tester profile is deprioritized but unlimited by default."""
+    with patch.dict(os.environ, {}, clear=True):
+        profile = get_resource_profile("tester")
+
+    assert profile.nice == 10
+    assert profile.ionice_class == 2
+    assert profile.memory_bytes is None
+    assert profile.cpu_seconds is None
+
+
+def test_get_resource_profile_env_overrides():
+    """Test COPIUM_<NAME>_* variables override the defaults."""
+    env = {
+        "COPIUM_TESTER_MEMORY_MB": "512",
+        "COPIUM_TESTER_CPU_SECONDS": "600",
+        "COPIUM_TESTER_NICE": "5",
+        "COPIUM_TESTER_IONICE": "3",
+    }
+    with patch.dict(os.environ, env, clear=True):
+        profile = get_resource_profile("tester")
+
+    assert profile.memory_bytes == 512 * 1024 * 1024
+    assert profile.cpu_seconds == 600
+    assert profile.nice == 5
+    assert profile.ionice_class == 3
+
+
+def test_get_resource_profile_unknown_name_is_empty():
+    """Test unknown profiles apply no limits."""
+    with patch.dict(os.environ, {}, clear=True):
+        assert not get_resource_profile("nonexistent")
+
+
+def test_classify_failure():
+    """Test limit breaches are told apart from ordinary failures."""
+    profile = ResourceProfile(memory_bytes=1024, cpu_seconds=10)
+
+    assert profile.classify_failure(0, 0, "MemoryError") is None
+    assert profile.classify_failure(1, 0, "AssertionError") is None
+    assert profile.classify_failure(-signal.SIGXCPU, 10, "") == "cpu"
+    assert profile.classify_failure(-signal.SIGKILL, 15, "") == "cpu"
+    assert profile.classify_failure(-signal.SIGKILL, 1, "") is None
+    assert profile.classify_failure(1, 0, "Traceback...\nMemoryError\n") == "memory"
+    # Without a memory limit an OOM is not ours to classify
+    assert ResourceProfile().classify_failure(1, 0, "MemoryError") is None
+
+
+@pytest.mark.asyncio
+async def test_run_command_reports_cpu_limit():
+    """Test a CPU-bound command is stopped and classified as a CPU limit breach."""
+    profile = ResourceProfile(cpu_seconds=1)
+
+    res = await shell.run_command(
+        sys.executable, ["-c", "while True: pass"], resource_profile=profile
+    )
+
+    assert res["limit_exceeded"] == "cpu"
+    assert res["exit_code"] != 0
+    assert "[LIMIT] Process exceeded its CPU time limit of 1s." in res["output"]
+
+
+@pytest.mark.asyncio
+async def test_run_command_reports_memory_limit():
+    """Test an allocation beyond RLIMIT_AS is classified as a memory limit breach."""
+    profile = ResourceProfile(memory_bytes=512 * 1024 * 1024)
+
+    res = await shell.run_command(
+        sys.executable,
+        ["-c", "x = bytearray(1024 * 1024 * 1024)"],
+        resource_profile=profile,
+    )
+
+    assert res["limit_exceeded"] == "memory"
+    assert "memory limit of 512 MB" in res["output"]
+
+
+@pytest.mark.asyncio
+async def test_run_command_applies_niceness():
+    """Test the child runs with the profile's niceness added."""
+    profile = ResourceProfile(nice=5)
+
+    res = await shell.run_command(
+        sys.executable,
+        ["-c", "import os; print(os.nice(0))"],
+        resource_profile=profile,
+    )
+
+    assert int(res["output"].strip()) == os.nice(0) + 5
+    assert "limit_exceeded" not in res
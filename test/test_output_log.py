@@ -0,0 +1,96 @@
+import re
+import sys
+
+import pytest
+
+from copium_loop import shell
+from copium_loop.constants import MAX_OUTPUT_SIZE
+from copium_loop.output_log import OutputLog, get_output_dir
+
+
+@pytest.fixture
+def output_log(tmp_path):
+    log = OutputLog.create("pytest", output_dir=tmp_path)
+    log.write("collected 3 items\n")
+    log.write("test_a.py::test_one PASSED\n")
+    log.write("test_a.py::test_two FAILED\n")
+    log.write("E   assert 1 == 2\n")
+    log.write("1 failed, 1 passed\n")
+    log.close()
+    return log
+
+
+def test_head_and_tail(output_log):
+    assert output_log.head(1) == "collected 3 items\n"
+    assert output_log.head(100).count("\n") == 5
+    assert output_log.tail(1) == "1 failed, 1 passed\n"
+    assert output_log.tail(2) == "E   assert 1 == 2\n1 failed, 1 passed\n"
+    assert output_log.tail(100) == output_log.head(100)
+
+
+def test_grep_and_search(output_log):
+    assert output_log.grep(r"FAILED|^E\s", re.MULTILINE) == [
+        "test_a.py::test_two FAILED",
+        "E   assert 1 == 2",
+    ]
+    assert output_log.grep(r"test_", max_count=1) == ["test_a.py::test_one PASSED"]
+    assert output_log.search(r"\b1 failed\b")
+    assert not output_log.search(r"Traceback")
+
+
+def test_slice_and_len(output_log):
+    assert output_log[:9] == "collected"
+    assert len(output_log) == len(output_log.head(100).encode())
+    with pytest.raises(TypeError):
+        output_log[0]
+
+
+def test_empty_log(tmp_path):
+    log = OutputLog.create("empty", output_dir=tmp_path)
+    log.close()
+    assert len(log) == 0
+    assert log.head() == ""
+    assert log.tail() == ""
+    assert log.grep("x") == []
+    assert log[:10] == ""
+
+
+def test_create_prunes_old_outputs(tmp_path, monkeypatch):
+    monkeypatch.setattr("copium_loop.output_log.MAX_SPILLED_OUTPUTS", 3)
+    for i in range(5):
+        OutputLog.create(f"cmd{i}", output_dir=tmp_path).close()
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert len(names) == 3
+    assert names[-1].endswith("-cmd4.log")
+
+
+def test_output_dir_follows_session(tmp_path):
+    out_dir = get_output_dir()
+    assert out_dir.is_relative_to(tmp_path / ".copium" / "outputs")
+
+
+@pytest.mark.asyncio
+async def test_run_command_spills_full_output():
+    script = (
+        "print('start')\n"
+        f"print('x' * {MAX_OUTPUT_SIZE * 2})\n"
+        "print('FAILED test_mid')\n"
+        f"print('y' * {MAX_OUTPUT_SIZE * 2})\n"
+        "print('end')\n"
+    )
+    res = await shell.run_command(sys.executable, ["-c", script], spill=True)
+
+    assert res["exit_code"] == 0
+    assert "FAILED test_mid" not in res["output"]
+    log = res["log"]
+    assert log.path.exists()
+    assert len(log) > MAX_OUTPUT_SIZE * 4
+    assert log.head(1) == "start\n"
+    assert log.tail(1) == "end\n"
+    assert log.grep(r"^FAILED", re.MULTILINE) == ["FAILED test_mid"]
+
+
+@pytest.mark.asyncio
+async def test_run_command_without_spill_has_no_log():
+    res = await shell.run_command(sys.executable, ["-c", "print('hi')"])
+    assert "log" not in res
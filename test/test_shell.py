@@ -9,6 +9,7 @@ import pytest
 
 from copium_loop import shell
 from copium_loop.shell import (
+    OutputSink,
     ProcessMonitor,
     StreamLogger,
     _clean_chunk,
@@ -405,6 +406,66 @@ async def test_stream_logger_with_telemetry():
         assert logger.buffer == ""
 
 
+@pytest.mark.asyncio
+async def test_output_sink_coalesces_writes():
+    """Test OutputSink batches chunks into one write per flush interval."""
+    stream = MagicMock()
+    sink = OutputSink(stream=stream, flush_interval=0.05)
+
+    for i in range(10):
+        sink.write(f"chunk{i}\n")
+    stream.write.assert_not_called()
+
+    await asyncio.sleep(0.1)
+    stream.write.assert_called_once_with("".join(f"chunk{i}\n" for i in range(10)))
+    stream.flush.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_output_sink_flushes_on_size_budget():
+    """Test OutputSink writes immediately once max_pending is reached."""
+    stream = MagicMock()
+    sink = OutputSink(stream=stream, flush_interval=10, max_pending=8)
+
+    sink.write("1234")
+    stream.write.assert_not_called()
+    sink.write("5678")
+    stream.write.assert_called_once_with("12345678")
+
+
+def test_output_sink_writes_through_without_loop():
+    """Test OutputSink does not buffer when no event loop is running."""
+    stream = MagicMock()
+    sink = OutputSink(stream=stream)
+
+    sink.write("hello")
+    stream.write.assert_called_once_with("hello")
+
+
+@pytest.mark.asyncio
+async def test_output_sink_quiet_mode():
+    """Test OutputSink echoes nothing in quiet mode."""
+    stream = MagicMock()
+    sink = OutputSink(stream=stream, quiet=True)
+
+    sink.write("hello")
+    sink.flush()
+    stream.write.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stream_logger_flush_drains_sink():
+    """Test StreamLogger.flush writes pending terminal output."""
+    stream = MagicMock()
+    with patch.object(shell, "_output_sink", OutputSink(stream=stream)):
+        logger = StreamLogger(node=None)
+        logger.process_chunk("a")
+        logger.process_chunk("b")
+        stream.write.assert_not_called()
+        logger.flush()
+        stream.write.assert_called_once_with("ab")
+
+
 @pytest.mark.asyncio
 async def test_process_monitor_early_exit():
     """Test ProcessMonitor exits early if process finishes."""
@@ -463,6 +524,68 @@ async def test_process_monitor_kill_exception():
         # Should finish without raising exception
 
 
+@pytest.mark.asyncio
+async def test_process_monitor_activity_postpones_inactivity_timeout():
+    """Test that output re-arms the inactivity deadline instead of tripping it."""
+    mock_proc = MagicMock()
+    mock_proc.returncode = None
+
+    monitor = ProcessMonitor(
+        mock_proc,
+        start_time=time.monotonic(),
+        command_timeout=None,
+        inactivity_timeout=0.2,
+        node=None,
+    )
+
+    with patch("copium_loop.shell.get_telemetry", return_value=None):
+        run_task = asyncio.create_task(monitor.run())
+        for _ in range(6):
+            await asyncio.sleep(0.05)
+            monitor.update_activity()
+        assert not run_task.done()
+        assert not monitor.timed_out
+
+        await asyncio.wait_for(run_task, timeout=1.0)
+
+    assert monitor.timed_out
+    assert "No output for 0.2s" in monitor.timeout_message
+    assert mock_proc.kill.called
+
+
+@pytest.mark.asyncio
+async def test_process_monitor_idle_does_not_poll():
+    """Test that an idle monitor holds timer handles instead of polling."""
+    mock_proc = MagicMock()
+    mock_proc.returncode = None
+
+    monitor = ProcessMonitor(
+        mock_proc,
+        start_time=time.monotonic(),
+        command_timeout=60,
+        inactivity_timeout=60,
+        node=None,
+    )
+
+    loop = asyncio.get_running_loop()
+    run_task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0)
+
+    # Both limits are single timer handles scheduled at their deadlines
+    assert monitor._command_handle.when() >= loop.time() + 59
+    assert monitor._inactivity_handle.when() >= loop.time() + 59
+
+    run_task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await run_task
+
+    # Cancelling the monitor must release its loop timers
+    assert monitor._command_handle is None
+    assert monitor._inactivity_handle is None
+    assert not monitor.timed_out
+    mock_proc.kill.assert_not_called()
+
+
 def test_clean_chunk_non_string():
     """Test _clean_chunk with non-string/bytes input."""
     assert _clean_chunk(123) == "123"
@@ -493,3 +616,76 @@ async def test_stream_subprocess_process_lookup_error():
         mock_exec.return_value = mock_proc
 
         await stream_subprocess("ls", [], {}, "test", 10)
+
+
+@pytest.mark.asyncio
+async def test_stream_subprocess_adapts_read_size():
+    """Test reads grow while the pipe is saturated and shrink for trickles."""
+    sizes = []
+    chunks = iter([None] * 8 + [b"tick\n"] * 8)
+
+    async def read(n):
+        sizes.append(n)
+        chunk = next(chunks, b"")
+        # None stands for a full pipe that fills the whole read
+        return b"x" * n if chunk is None else chunk
+
+    with patch("asyncio.create_subprocess_exec") as mock_exec:
+        mock_proc = MagicMock()
+        mock_proc.stdout.read = read
+        mock_proc.wait = AsyncMock(return_value=0)
+        mock_proc.returncode = 0
+        mock_exec.return_value = mock_proc
+
+        result = await stream_subprocess("ls", [], {}, None, 10, capture_stderr=False)
+
+    assert sizes[0] == shell.STREAM_READ_MIN_SIZE
+    assert max(sizes) == shell.STREAM_READ_MAX_SIZE
+    assert sizes[-1] == shell.STREAM_READ_MIN_SIZE
+    assert result.stdout.endswith("tick\n" * 8)
+
+
+@pytest.mark.asyncio
+async def test_stream_subprocess_logs_resource_metrics():
+    """Test every command's cost is logged as labelled telemetry metrics."""
+    with patch("copium_loop.shell.get_telemetry") as mock_get_telemetry:
+        mock_telemetry = MagicMock()
+        mock_get_telemetry.return_value = mock_telemetry
+
+        result = await stream_subprocess(
+            sys.executable,
+            ["-c", "import sys; print('out'); sys.stderr.write('err!')"],
+            os.environ.copy(),
+            "tester",
+            10,
+        )
+
+    metrics = {
+        call.args[1]: (call.args[2], call.kwargs["labels"])
+        for call in mock_telemetry.log_metric.call_args_list
+    }
+    assert metrics["command_stdout_bytes"][0] == 4
+    assert metrics["command_stderr_bytes"][0] == 4
+    assert metrics["command_wall_time"][0] > 0
+    assert metrics["command_cpu_user"][0] + metrics["command_cpu_sys"][0] > 0
+    expected_labels = {
+        "command": os.path.basename(sys.executable),
+        "exit_reason": "exit",
+    }
+    assert all(labels == expected_labels for _, labels in metrics.values())
+    assert result.usage.metrics["command_stdout_bytes"] == 4
+
+
+@pytest.mark.asyncio
+async def test_stream_subprocess_usage_exit_reason_timeout():
+    """Test timed out commands are accounted with exit_reason 'timeout'."""
+    result = await stream_subprocess(
+        sys.executable,
+        ["-c", "import time; time.sleep(5)"],
+        os.environ.copy(),
+        None,
+        0.2,
+    )
+
+    assert result.usage.exit_reason == "timeout"
+    assert result.usage.metrics["command_wall_time"] >= 0.2
@@ -0,0 +1,113 @@
+import asyncio
+import contextlib
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from copium_loop import shell
+from copium_loop.shell import stream_subprocess
+
+FORKING_CHILD = str(Path(__file__).parent / "mocks" / "forking_child.py")
+
+pytestmark = pytest.mark.skipif(
+    not Path("/proc").is_dir(), reason="descendant accounting needs /proc"
+)
+
+
+def is_alive(pid: int) -> bool:
+    """True if pid exists and is not a zombie waiting to be reaped."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return False
+    return stat[stat.rfind(b")") + 2 :].split()[0] != b"Z"
+
+
+def worker_pids(output: str) -> list[int]:
+    return [int(pid) for pid in re.findall(r"WORKER (\d+)", output)]
+
+
+@pytest.mark.asyncio
+async def test_timeout_reaps_whole_process_tree():
+    result = await stream_subprocess(
+        sys.executable,
+        [FORKING_CHILD, "--workers", "3", "--grandchildren"],
+        os.environ.copy(),
+        node=None,
+        command_timeout=1,
+    )
+
+    pids = worker_pids(result.stdout)
+    assert len(pids) == 6
+    assert result.timed_out
+    assert result.reaped_descendants == 6
+    assert not any(is_alive(pid) for pid in pids)
+
+
+@pytest.mark.asyncio
+async def test_timeout_escalates_to_sigkill_after_grace_period():
+    with patch("copium_loop.shell.PROCESS_GROUP_GRACE_PERIOD", 0.3):
+        start = time.monotonic()
+        result = await stream_subprocess(
+            sys.executable,
+            [FORKING_CHILD, "--workers", "2", "--ignore-term"],
+            os.environ.copy(),
+            node=None,
+            command_timeout=0.5,
+        )
+        elapsed = time.monotonic() - start
+
+    pids = worker_pids(result.stdout)
+    assert len(pids) == 2
+    assert result.reaped_descendants == 2
+    assert not any(is_alive(pid) for pid in pids)
+    # Workers ignored SIGTERM, so the grace period had to run out
+    assert elapsed >= 0.5 + 0.3
+    assert elapsed < 5
+
+
+@pytest.mark.asyncio
+async def test_cancellation_reaps_whole_process_tree():
+    lines = []
+
+    def capture(chunk):
+        lines.append(chunk)
+
+    with patch.object(shell.StreamLogger, "process_chunk", side_effect=capture):
+        task = asyncio.create_task(
+            stream_subprocess(
+                sys.executable,
+                [FORKING_CHILD, "--workers", "2"],
+                os.environ.copy(),
+                node=None,
+                command_timeout=30,
+            )
+        )
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            if "READY" in "".join(lines):
+                break
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    pids = worker_pids("".join(lines))
+    assert len(pids) == 2
+    assert not any(is_alive(pid) for pid in pids)
+
+
+@pytest.mark.asyncio
+async def test_run_command_reports_reaped_descendants():
+    with patch("copium_loop.shell.INACTIVITY_TIMEOUT", 0.5):
+        res = await shell.run_command(
+            sys.executable, [FORKING_CHILD, "--workers", "2"], node="tester"
+        )
+
+    assert res["exit_code"] == -1
+    assert "Reaped 2 descendant process(es)" in res["output"]
@@ -1,6 +1,6 @@
 import unittest
 
-from copium_loop.shell import _clean_chunk
+from copium_loop.shell import StreamCleaner, _clean_chunk
 
 
 class TestShellSecurity(unittest.TestCase):
@@ -48,5 +48,45 @@ class TestShellSecurity(unittest.TestCase):
         self.assertEqual(_clean_chunk(content), "Start Green Middle End")
 
 
+
+class TestStreamCleaner(unittest.TestCase):
+    def clean(self, chunks):
+        cleaner = StreamCleaner()
+        return "".join(cleaner.feed(chunk) for chunk in chunks) + cleaner.finish()
+
+    def test_matches_clean_chunk_on_whole_input(self):
+        """Test StreamCleaner strips the same sequences as _clean_chunk."""
+        content = b"Start \x1b[32mGreen\x1b[0m Middle \x1b]0;Hidden\x07End\x00\x7f"
+        self.assertEqual(self.clean([content]), _clean_chunk(content))
+
+    def test_escape_sequence_split_across_chunks(self):
+        """Test CSI and OSC sequences straddling a read boundary are stripped."""
+        self.assertEqual(self.clean([b"Red \x1b[3", b"1mText"]), "Red Text")
+        self.assertEqual(
+            self.clean([b"\x1b]8;;https://exa", b"mple.com\x1b", b"\\Link"]), "Link"
+        )
+
+    def test_every_split_point(self):
+        """Test output is independent of where the stream is split."""
+        content = "A\x1b[1mB\x1b]0;T\x07C é \x1b]8;;u\x1b\\D\x1b(0E\n".encode()
+        expected = _clean_chunk(content)
+        for i in range(len(content) + 1):
+            with self.subTest(split=i):
+                self.assertEqual(self.clean([content[:i], content[i:]]), expected)
+
+    def test_utf8_split_across_chunks(self):
+        """Test multi-byte characters are not replaced when split."""
+        data = "résumé ✔".encode()
+        self.assertEqual(self.clean([data[:2], data[2:9], data[9:]]), "résumé ✔")
+
+    def test_unterminated_sequence_flushed_at_end(self):
+        """Test a dangling escape at EOF does not swallow the stream."""
+        self.assertEqual(self.clean([b"done\x1b["]), "done[")
+
+    def test_str_chunks(self):
+        """Test already-decoded chunks are accepted."""
+        self.assertEqual(self.clean(["\x1b[31", "mHello\x00"]), "Hello")
+
+
 if __name__ == "__main__":
     unittest.main()
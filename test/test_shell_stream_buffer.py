@@ -1,5 +1,6 @@
 import os
 import sys
+from unittest.mock import patch
 
 import pytest
 
@@ -8,7 +9,7 @@ from copium_loop.shell import StreamBuffer, stream_subprocess
 
 def test_stream_buffer_truncation():
     limit = 10
-    buffer = StreamBuffer(limit, "Test")
+    buffer = StreamBuffer(limit, "Test", head_size=4)
     buffer.append("12345")
     assert buffer.get_content() == "12345"
     assert not buffer.truncated
@@ -19,11 +20,32 @@ def test_stream_buffer_truncation():
 
     buffer.append("!")
     assert buffer.truncated
-    assert buffer.get_content() == "1234567890\n[... Test Truncated ...]\n"
+    assert buffer.get_content() == "1234\n[... Test Truncated ...]\n67890!"
 
     buffer.append("more")
-    # Should not add more
-    assert buffer.get_content() == "1234567890\n[... Test Truncated ...]\n"
+    # The tail keeps rolling while the head stays fixed
+    assert buffer.get_content() == "1234\n[... Test Truncated ...]\n0!more"
+    assert buffer.dropped == 5
+
+
+def test_stream_buffer_keeps_end_of_long_output():
+    buffer = StreamBuffer(100, "Output")
+    for i in range(10_000):
+        buffer.append(f"line {i}\n")
+    buffer.append("VERDICT: OK\n")
+
+    content = buffer.get_content()
+    assert content.startswith("line 0\n")
+    assert content.endswith("VERDICT: OK\n")
+    assert "[... Output Truncated ...]" in content
+    assert buffer.head_len + buffer.tail_len == 100
+
+
+def test_stream_buffer_single_huge_chunk():
+    buffer = StreamBuffer(10, "Test", head_size=2)
+    buffer.append("abcdefghijklmnopqrstuvwxyz")
+    assert buffer.get_content() == "ab\n[... Test Truncated ...]\nstuvwxyz"
+    assert buffer.dropped == 16
 
 
 @pytest.mark.asyncio
@@ -59,3 +81,44 @@ async def test_stream_subprocess_interleaving():
     out2_idx = interleaved.find("out2")
 
     assert out1_idx < err1_idx < out2_idx
+
+
+def test_stream_buffer_stream_views():
+    buffer = StreamBuffer(100, "Combined")
+    buffer.append("out1\n", "stdout")
+    buffer.append("err1\n", "stderr")
+    buffer.append("out2\n", "stdout")
+
+    assert buffer.get_content("stdout") == "out1\nout2\n"
+    assert buffer.get_content("stderr") == "err1\n"
+    assert buffer.get_content() == "out1\nerr1\nout2\n"
+
+
+def test_stream_buffer_truncation_marks_only_affected_streams():
+    buffer = StreamBuffer(10, "Combined", head_size=2)
+    buffer.append("ok", "stderr")
+    buffer.append("0123456789abc", "stdout")
+
+    assert buffer.get_content("stderr") == "ok"
+    assert buffer.get_content("stdout") == "\n[... Output Truncated ...]\n56789abc"
+    assert "[... Combined Truncated ...]" in buffer.get_content()
+
+
+@pytest.mark.asyncio
+async def test_stream_subprocess_views_are_lazy():
+    script = "import sys; sys.stdout.write('out\\n'); sys.stderr.write('err\\n')"
+    result = await stream_subprocess(
+        sys.executable, ["-c", script], os.environ.copy(), None, 10
+    )
+
+    with patch.object(
+        StreamBuffer, "get_content", wraps=result.capture.get_content
+    ) as mock_get:
+        interleaved, exit_code, timed_out, _ = result[2:]
+        mock_get.assert_called_once_with()
+
+    assert exit_code == 0
+    assert not timed_out
+    assert "out" in interleaved and "err" in interleaved
+    assert result.stdout == "out\n"
+    assert result.stderr == "err\n"
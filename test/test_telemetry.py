@@ -512,3 +512,14 @@ def test_telemetry_log_metric(telemetry_with_temp_dir):
     assert events[0]["event_type"] == "metric"
     assert events[0]["data"]["name"] == "latency"
     assert events[0]["data"]["value"] == 1.5
+
+
+def test_telemetry_log_metric_with_labels(telemetry_with_temp_dir):
+    """Test log_metric records labels alongside the value."""
+    telemetry_with_temp_dir.log_metric(
+        "tester", "command_wall_time", 2.0, labels={"command": "pytest"}
+    )
+    telemetry_with_temp_dir.log_metric("tester", "tokens", 3)
+    events = telemetry_with_temp_dir.read_log()
+    assert events[0]["data"]["labels"] == {"command": "pytest"}
+    assert "labels" not in events[1]["data"]